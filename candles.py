@@ -0,0 +1,45 @@
+import numpy as np
+
+# Vectorized OHLCV candle aggregation, shared by the 4h resampler and the
+# chart downsampling.
+
+MAX_CHART_CANDLES = 300
+
+
+def aggregate_ohlcv(starts, times, open_arr, high_arr, low_arr, close_arr, vol_arr):
+    # Merge each run of candles beginning at an index in `starts` into one candle
+    ends = np.r_[starts[1:], times.size] - 1
+    return (
+        times[starts],
+        open_arr[starts],
+        np.maximum.reduceat(high_arr, starts),
+        np.minimum.reduceat(low_arr, starts),
+        close_arr[ends],
+        np.add.reduceat(vol_arr, starts),
+    )
+
+
+def resample_ohlcv(times, open_arr, high_arr, low_arr, close_arr, vol_arr, seconds):
+    # Aggregate candles into epoch-aligned buckets of `seconds` in one vectorized pass
+    buckets = times // seconds
+    # Drop a leading bucket that the fetched window only partially covers
+    if times[0] % seconds and buckets[-1] != buckets[0]:
+        keep = buckets != buckets[0]
+        open_arr, high_arr, low_arr, close_arr, vol_arr, buckets = (
+            arr[keep] for arr in (open_arr, high_arr, low_arr, close_arr, vol_arr, buckets)
+        )
+    starts = np.flatnonzero(np.r_[True, buckets[1:] != buckets[:-1]])
+    return aggregate_ohlcv(starts, buckets * seconds, open_arr, high_arr, low_arr, close_arr, vol_arr)
+
+
+def display_stride(size, max_candles=MAX_CHART_CANDLES):
+    # Number of candles merged per displayed candle to stay within max_candles
+    return -(-size // max_candles)
+
+
+def downsample_ohlcv(stride, times, open_arr, high_arr, low_arr, close_arr, vol_arr):
+    # Groups are anchored on the newest candle, so when the size is not a
+    # multiple of stride the short group is the oldest one, not the live one
+    size = times.size
+    starts = np.r_[0, np.arange(size % stride or stride, size, stride)]
+    return aggregate_ohlcv(starts, times, open_arr, high_arr, low_arr, close_arr, vol_arr)
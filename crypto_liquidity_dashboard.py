@@ -1,69 +1,167 @@
+import orjson
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util import Retry
+import numpy as np
 import pandas as pd
 import streamlit as st
 import plotly.graph_objects as go
-from ta.volume import OnBalanceVolumeIndicator, money_flow_index
+
+from candles import downsample_ohlcv, display_stride, resample_ohlcv
+from indicators import money_flow_index, on_balance_volume
+
+CRYPTOCOMPARE_BASE_URL = "https://min-api.cryptocompare.com"
+
+INTERVAL_SECONDS = {"1h": 3600, "4h": 4 * 3600, "1d": 24 * 3600}
+
+# ==============================
+# HTTP Session - Shared Connection Pool
+# ==============================
+@st.cache_resource
+def get_http_session():
+    # Streamlit re-executes this script on every rerun, so the session is kept
+    # in cache_resource to reuse keep-alive TLS connections across reruns.
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=8, pool_maxsize=8, max_retries=Retry(total=2, backoff_factor=0.2))
+    session.mount("https://", adapter)
+    return session
 
 # ==============================
 # CryptoCompare API - Get OHLCV Data
 # ==============================
-@st.cache_data(ttl=60)
 def get_cryptocompare_ohlcv(symbol="BTC", vs_currency="USDT", interval="hour", limit=200):
+    # Cache lifetime follows the candle size: daily candles barely move within a minute
+    if interval == "1d":
+        return _get_daily_ohlcv(symbol, vs_currency, interval, limit)
+    return _get_intraday_ohlcv(symbol, vs_currency, interval, limit)
+
+@st.cache_data(ttl=60)
+def _get_intraday_ohlcv(symbol, vs_currency, interval, limit):
+    return _fetch_cryptocompare_ohlcv(symbol, vs_currency, interval, limit)
+
+@st.cache_data(ttl=600)
+def _get_daily_ohlcv(symbol, vs_currency, interval, limit):
+    return _fetch_cryptocompare_ohlcv(symbol, vs_currency, interval, limit)
+
+def _fetch_cryptocompare_ohlcv(symbol, vs_currency, interval, limit):
     if interval == "1h":
-        url = "https://min-api.cryptocompare.com/data/v2/histohour"
+        url = f"{CRYPTOCOMPARE_BASE_URL}/data/v2/histohour"
     elif interval == "4h":
-        url = "https://min-api.cryptocompare.com/data/v2/histohour"
+        url = f"{CRYPTOCOMPARE_BASE_URL}/data/v2/histohour"
         limit = limit * 4
     elif interval == "1d":
-        url = "https://min-api.cryptocompare.com/data/v2/histoday"
+        url = f"{CRYPTOCOMPARE_BASE_URL}/data/v2/histoday"
     else:
         st.error("تایم‌فریم نامعتبر")
-        return pd.DataFrame()
+        st.stop()
 
     params = {"fsym": symbol, "tsym": vs_currency, "limit": limit}
 
     try:
-        response = requests.get(url, params=params, timeout=10)
+        response = get_http_session().get(url, params=params, timeout=10)
         response.raise_for_status()
-        data = response.json()
-    except requests.exceptions.RequestException as e:
+        data = orjson.loads(response.content)
+    except (requests.exceptions.RequestException, orjson.JSONDecodeError) as e:
         st.error(f"خطا در ارتباط با API CryptoCompare: {e}")
-        return pd.DataFrame()
+        st.stop()
 
     if not data or 'Data' not in data or 'Data' not in data['Data'] or not data['Data']['Data']:
         st.warning(f"هیچ داده‌ای برای نماد {symbol} و تایم‌فریم {interval} دریافت نشد. لطفا نماد یا تایم‌فریم را بررسی کنید.")
-        return pd.DataFrame()
-
-    df = pd.DataFrame(data['Data']['Data'])
-    
-    # Rename and clean up columns to match previous code logic
-    df = df[['time', 'open', 'high', 'low', 'close', 'volumefrom']]
-    df.rename(columns={'time': 'time_open', 'volumefrom': 'volume'}, inplace=True)
-    
-    df["time_open"] = pd.to_datetime(df["time_open"], unit="s")
-    
-    numeric_cols = ["open", "high", "low", "close", "volume"]
-    for col in numeric_cols:
-        df[col] = pd.to_numeric(df[col], errors='coerce')
-    
-    df.dropna(subset=numeric_cols, inplace=True)
-
-    if df.empty:
+        st.stop()
+
+    # Build one contiguous array per field straight from the JSON rows;
+    # np.array maps missing (None) values to NaN so they are masked below
+    rows = data['Data']['Data']
+    times = np.array([row["time"] for row in rows], dtype=np.int64)
+    open_arr = np.array([row["open"] for row in rows], dtype=np.float64)
+    high_arr = np.array([row["high"] for row in rows], dtype=np.float64)
+    low_arr = np.array([row["low"] for row in rows], dtype=np.float64)
+    close_arr = np.array([row["close"] for row in rows], dtype=np.float64)
+    vol_arr = np.array([row["volumefrom"] for row in rows], dtype=np.float64)
+
+    valid = np.isfinite(open_arr) & np.isfinite(high_arr) & np.isfinite(low_arr) & np.isfinite(close_arr) & np.isfinite(vol_arr)
+    if not valid.all():
+        times, open_arr, high_arr, low_arr, close_arr, vol_arr = (
+            arr[valid] for arr in (times, open_arr, high_arr, low_arr, close_arr, vol_arr)
+        )
+
+    if times.size == 0:
         st.warning("داده‌های دریافت شده قابل پردازش نبودند.")
-        return pd.DataFrame()
-        
-    # Recalculate indicators and volume direction on the new data
-    df["volume_direction"] = df.apply(lambda row: row["volume"] if row["close"] >= row["open"] else -row["volume"], axis=1)
-
-    if len(df) > 1:
-        df["obv"] = OnBalanceVolumeIndicator(close=df["close"], volume=df["volume"]).on_balance_volume()
-        df["mfi"] = money_flow_index(high=df["high"], low=df["low"], close=df["close"], volume=df["volume"])
+        st.stop()
+
+    # CryptoCompare has no 4h endpoint: fold the hourly candles into 4h candles
+    if interval == "4h":
+        times, open_arr, high_arr, low_arr, close_arr, vol_arr = resample_ohlcv(
+            times, open_arr, high_arr, low_arr, close_arr, vol_arr, INTERVAL_SECONDS["4h"]
+        )
+
+    # Compute indicators and volume direction on the raw arrays
+    volume_direction = np.where(close_arr >= open_arr, vol_arr, -vol_arr)
+
+    if times.size > 1:
+        obv = on_balance_volume(close_arr, vol_arr)
+        mfi = money_flow_index(high_arr, low_arr, close_arr, vol_arr, 14)
     else:
-        df["obv"] = pd.Series([0] * len(df))
-        df["mfi"] = pd.Series([0] * len(df))
-        
+        obv = np.zeros(times.size)
+        mfi = np.zeros(times.size)
+
+    df = pd.DataFrame({
+        "time_open": pd.to_datetime(times, unit="s", utc=True),
+        "open": open_arr,
+        "high": high_arr,
+        "low": low_arr,
+        "close": close_arr,
+        "volume": vol_arr,
+        "volume_direction": volume_direction,
+        "obv": obv,
+        "mfi": mfi,
+    })
+
     return df
 
+# ==============================
+# Charts - Figures and Indicator Readings
+# ==============================
+def _timeframe_label(seconds):
+    # Label for the candle size actually drawn, e.g. "2h" or "2d"
+    if seconds % INTERVAL_SECONDS["1d"] == 0:
+        return f"{seconds // INTERVAL_SECONDS['1d']}d"
+    return f"{seconds // INTERVAL_SECONDS['1h']}h"
+
+def build_charts(coin, interval, times, open_arr, high_arr, low_arr, close_arr, vol_arr, obv, mfi):
+    # Last OBV, its change over the last candle, and last MFI
+    indicators = (obv[-1], obv[-1] - obv[-2], mfi[-1]) if times.size > 1 else None
+
+    # Merge neighbouring candles for display only; indicators stay full resolution
+    stride = display_stride(times.size)
+    if stride > 1:
+        times, open_arr, high_arr, low_arr, close_arr, vol_arr = downsample_ohlcv(
+            stride, times, open_arr, high_arr, low_arr, close_arr, vol_arr
+        )
+    timeframe = _timeframe_label(INTERVAL_SECONDS[interval] * stride)
+
+    fig_price = go.Figure(data=[go.Candlestick(
+        x=times,
+        open=open_arr,
+        high=high_arr,
+        low=low_arr,
+        close=close_arr,
+        increasing_line_color='green',
+        decreasing_line_color='red'
+    )])
+    fig_price.update_layout(title=f'نمودار شمعی قیمت {coin} - {timeframe}',
+                            xaxis_rangeslider_visible=False)
+
+    fig_vol = go.Figure(data=[go.Bar(
+        x=times,
+        y=vol_arr,
+        marker_color=np.where(close_arr >= open_arr, 'green', 'red')
+    )])
+    fig_vol.update_layout(title=f'نمودار حجم {coin} - {timeframe}',
+                          xaxis_title='زمان', yaxis_title='حجم')
+
+    return fig_price, fig_vol, indicators
+
 # ==============================
 # Streamlit App
 # ==============================
@@ -91,62 +189,43 @@ symbol = coins[selected_coin]
 # Get data
 df = get_cryptocompare_ohlcv(symbol, "USDT", interval, limit)
 
-# Only display charts if DataFrame is not empty
-if not df.empty:
-    st.subheader(f"تحلیل نقدینگی {selected_coin} - تایم‌فریم {interval}")
-
-    # Display charts
-    fig_price = go.Figure(data=[go.Candlestick(
-        x=df['time_open'],
-        open=df['open'],
-        high=df['high'],
-        low=df['low'],
-        close=df['close'],
-        increasing_line_color='green',
-        decreasing_line_color='red'
-    )])
-    fig_price.update_layout(title=f'نمودار شمعی قیمت {selected_coin}',
-                            xaxis_rangeslider_visible=False)
-
-    fig_vol = go.Figure(data=[go.Bar(
-        x=df['time_open'],
-        y=df['volume'],
-        marker_color=['green' if close >= open else 'red' for open, close in zip(df['open'], df['close'])]
-    )])
-    fig_vol.update_layout(title=f'نمودار حجم {selected_coin}',
-                          xaxis_title='زمان', yaxis_title='حجم')
-
-    col1, col2 = st.columns(2)
-    with col1:
-        st.plotly_chart(fig_price, use_container_width=True)
-    with col2:
-        st.plotly_chart(fig_vol, use_container_width=True)
-
-    # Display indicators
-    st.subheader("شاخص‌های نقدینگی")
-    col3, col4 = st.columns(2)
-
-    if len(df) > 1:
-        with col3:
-            try:
-                current_obv = df['obv'].iloc[-1]
-                obv_delta = df['obv'].diff().iloc[-1]
-                st.metric("شاخص OBV", f"{current_obv:,.0f}", f"{obv_delta:,.0f}")
-                st.caption("افزایش OBV نشان‌دهنده ورود نقدینگی است.")
-            except IndexError:
-                st.info("داده کافی برای محاسبه OBV وجود ندارد.")
-
-        with col4:
-            try:
-                current_mfi = df['mfi'].iloc[-1]
-                st.metric("شاخص MFI", f"{current_mfi:.2f}")
-                st.caption("بالاتر از ۸۰ فشار خرید و پایین‌تر از ۲۰ فشار فروش را نشان می‌دهد.")
-            except IndexError:
-                st.info("داده کافی برای محاسبه MFI وجود ندارد.")
-    else:
-        st.info("داده کافی برای نمایش شاخص‌ها وجود ندارد.")
-
-    st.markdown("---")
-    st.caption("منبع داده: CryptoCompare API (Real-time)")
+st.subheader(f"تحلیل نقدینگی {selected_coin} - تایم‌فریم {interval}")
+
+# Display charts
+fig_price, fig_vol, indicators = build_charts(
+    selected_coin,
+    interval,
+    df['time_open'].values,
+    df['open'].to_numpy(),
+    df['high'].to_numpy(),
+    df['low'].to_numpy(),
+    df['close'].to_numpy(),
+    df['volume'].to_numpy(),
+    df['obv'].to_numpy(),
+    df['mfi'].to_numpy(),
+)
+
+col1, col2 = st.columns(2)
+with col1:
+    st.plotly_chart(fig_price, use_container_width=True)
+with col2:
+    st.plotly_chart(fig_vol, use_container_width=True)
+
+# Display indicators
+st.subheader("شاخص‌های نقدینگی")
+col3, col4 = st.columns(2)
+
+if indicators is not None:
+    current_obv, obv_delta, current_mfi = indicators
+    with col3:
+        st.metric("شاخص OBV", f"{current_obv:,.0f}", f"{obv_delta:,.0f}")
+        st.caption("افزایش OBV نشان‌دهنده ورود نقدینگی است.")
+
+    with col4:
+        st.metric("شاخص MFI", f"{current_mfi:.2f}")
+        st.caption("بالاتر از ۸۰ فشار خرید و پایین‌تر از ۲۰ فشار فروش را نشان می‌دهد.")
 else:
-    st.info("در حال حاضر داده‌ای برای نمایش موجود نیست. لطفاً تنظیمات را بررسی کنید.")
+    st.info("داده کافی برای نمایش شاخص‌ها وجود ندارد.")
+
+st.markdown("---")
+st.caption("منبع داده: CryptoCompare API (Real-time)")
@@ -0,0 +1,65 @@
+import numpy as np
+from numba import njit
+
+# Numba kernels for the liquidity indicators. They live outside the Streamlit
+# script because the script is re-executed on every rerun, while an imported
+# module is compiled (or loaded from the on-disk cache) once per process.
+
+@njit("float64[:](float64[:], float64[:])", cache=True)
+def on_balance_volume(close, volume):
+    # On-Balance Volume accumulated in a single pass. Like ta, an unchanged
+    # close counts as inflow, so the first candle contributes +volume.
+    out = np.empty(close.size)
+    acc = 0.0
+    for i in range(close.size):
+        if i > 0 and close[i] < close[i - 1]:
+            acc -= volume[i]
+        else:
+            acc += volume[i]
+        out[i] = acc
+    return out
+
+@njit("float64[:](float64[:], float64[:], float64[:], float64[:], int64)", cache=True)
+def money_flow_index(high, low, close, volume, n):
+    # Money Flow Index in one pass with running positive/negative flow sums.
+    # NaN until the window is full; a window with no negative flow reads 100.
+    size = close.size
+    out = np.full(size, np.nan)
+    pos_flow = np.zeros(size)
+    neg_flow = np.zeros(size)
+    pos_sum = 0.0
+    neg_sum = 0.0
+    pos_count = 0
+    neg_count = 0
+    prev_tp = 0.0
+    for i in range(size):
+        tp = (high[i] + low[i] + close[i]) / 3.0
+        if i > 0:
+            if tp > prev_tp:
+                pos_flow[i] = tp * volume[i]
+            elif tp < prev_tp:
+                neg_flow[i] = tp * volume[i]
+        prev_tp = tp
+        pos_sum += pos_flow[i]
+        neg_sum += neg_flow[i]
+        if pos_flow[i] > 0.0:
+            pos_count += 1
+        if neg_flow[i] > 0.0:
+            neg_count += 1
+        if i >= n:
+            pos_sum -= pos_flow[i - n]
+            neg_sum -= neg_flow[i - n]
+            if pos_flow[i - n] > 0.0:
+                pos_count -= 1
+            if neg_flow[i - n] > 0.0:
+                neg_count -= 1
+        # Add/subtract round-off leaves a residue once all flows of one side
+        # have left the window; reset it so MFI lands exactly on 0 or 100
+        if pos_count == 0:
+            pos_sum = 0.0
+        if neg_count == 0:
+            neg_sum = 0.0
+        if i >= n - 1:
+            mfr = pos_sum / neg_sum if neg_sum > 0.0 else np.inf
+            out[i] = 100.0 - 100.0 / (1.0 + mfr)
+    return out
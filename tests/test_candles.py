@@ -0,0 +1,68 @@
+import numpy as np
+import pandas as pd
+
+from candles import display_stride, downsample_ohlcv, resample_ohlcv
+
+HOUR = 3600
+
+
+def _hourly(size, start):
+    times = start + HOUR * np.arange(size, dtype=np.int64)
+    open_arr = np.arange(size, dtype=np.float64)
+    high_arr = open_arr + 1
+    low_arr = open_arr - 1
+    close_arr = open_arr + 0.5
+    vol_arr = np.ones(size)
+    return times, open_arr, high_arr, low_arr, close_arr, vol_arr
+
+
+def test_resample_matches_pandas_4h_buckets():
+    # Starts two hours into a 4h bucket, so the leading partial bucket is dropped
+    start = 1700000000 // (4 * HOUR) * (4 * HOUR) + 2 * HOUR
+    times, open_arr, high_arr, low_arr, close_arr, vol_arr = _hourly(30, start)
+
+    result = resample_ohlcv(times, open_arr, high_arr, low_arr, close_arr, vol_arr, 4 * HOUR)
+
+    frame = pd.DataFrame(
+        {"open": open_arr, "high": high_arr, "low": low_arr, "close": close_arr, "volume": vol_arr},
+        index=pd.to_datetime(times, unit="s"),
+    )
+    expected = frame.resample("4h").agg(
+        {"open": "first", "high": "max", "low": "min", "close": "last", "volume": "sum"}
+    ).iloc[1:]
+
+    np.testing.assert_array_equal(pd.to_datetime(result[0], unit="s"), expected.index)
+    for column, values in zip(expected.columns, result[1:]):
+        np.testing.assert_allclose(values, expected[column].to_numpy())
+
+
+def test_display_stride():
+    assert display_stride(300) == 1
+    assert display_stride(301) == 2
+    assert display_stride(501) == 2
+
+
+def test_downsample_keeps_newest_group_full():
+    times, open_arr, high_arr, low_arr, close_arr, vol_arr = _hourly(301, 0)
+
+    times2, open2, high2, low2, close2, vol2 = downsample_ohlcv(
+        2, times, open_arr, high_arr, low_arr, close_arr, vol_arr
+    )
+
+    assert times2.size == 151
+    # The odd candle out is the oldest one; the live candle closes a full group
+    assert vol2[0] == 1.0
+    assert np.all(vol2[1:] == 2.0)
+    assert close2[-1] == close_arr[-1]
+    assert open2[-1] == open_arr[-2]
+    assert high2[-1] == high_arr[-1]
+    assert low2[-1] == low_arr[-2]
+
+
+def test_downsample_exact_multiple_has_no_partial_group():
+    times, open_arr, high_arr, low_arr, close_arr, vol_arr = _hourly(300, 0)
+
+    result = downsample_ohlcv(3, times, open_arr, high_arr, low_arr, close_arr, vol_arr)
+
+    assert result[0].size == 100
+    assert np.all(result[5] == 3.0)
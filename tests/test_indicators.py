@@ -0,0 +1,78 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from indicators import money_flow_index, on_balance_volume
+
+ta_volume = pytest.importorskip("ta.volume")
+
+
+def _random_ohlcv(rng, size, base=100.0):
+    close = base + np.cumsum(rng.normal(size=size))
+    high = close + rng.random(size)
+    low = close - rng.random(size)
+    volume = rng.random(size) * 1000
+    return high, low, close, volume
+
+
+def _ta_mfi(high, low, close, volume):
+    return ta_volume.money_flow_index(
+        high=pd.Series(high), low=pd.Series(low), close=pd.Series(close), volume=pd.Series(volume)
+    ).to_numpy()
+
+
+@pytest.mark.parametrize("size", [5, 14, 15, 200, 500])
+def test_mfi_matches_ta(size):
+    high, low, close, volume = _random_ohlcv(np.random.default_rng(size), size)
+
+    expected = _ta_mfi(high, low, close, volume)
+    actual = money_flow_index(high, low, close, volume, 14)
+
+    np.testing.assert_allclose(actual, expected, equal_nan=True)
+
+
+def test_mfi_window_with_only_negative_flow_is_exactly_zero():
+    # Large prices make the running-sum round-off visible: after 40 up bars
+    # and 20 down bars the window holds no positive flow at all
+    rng = np.random.default_rng(0)
+    for _ in range(200):
+        steps = np.r_[rng.random(40) * 50, -rng.random(20) * 50]
+        close = 60000 + np.cumsum(steps)
+        volume = rng.random(60) * 10 + 1
+
+        expected = _ta_mfi(close, close, close, volume)[-1]
+        actual = money_flow_index(close, close, close, volume, 14)[-1]
+
+        assert expected == 0.0
+        assert actual == 0.0
+
+
+def test_mfi_without_negative_flow_reads_100():
+    close = np.arange(1.0, 31.0)
+    assert money_flow_index(close, close, close, close, 14)[-1] == 100.0
+
+    flat = np.ones(30)
+    assert money_flow_index(flat, flat, flat, flat, 14)[-1] == 100.0
+
+
+def test_obv_matches_ta():
+    rng = np.random.default_rng(0)
+    # Rounded closes so that unchanged closes are exercised too
+    close = np.round(rng.random(300) * 5)
+    volume = rng.random(300) * 100
+
+    expected = ta_volume.OnBalanceVolumeIndicator(
+        close=pd.Series(close), volume=pd.Series(volume)
+    ).on_balance_volume().to_numpy()
+
+    np.testing.assert_allclose(on_balance_volume(close, volume), expected)
+
+
+def test_mfi_matches_ta_with_zero_volume_candles():
+    high, low, close, volume = _random_ohlcv(np.random.default_rng(7), 300)
+    volume[::5] = 0.0
+
+    expected = _ta_mfi(high, low, close, volume)
+    actual = money_flow_index(high, low, close, volume, 14)
+
+    np.testing.assert_allclose(actual, expected, equal_nan=True)